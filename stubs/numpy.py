@@ -12,6 +12,8 @@ from mypy_extensions import (
 
 T = TypeVar('T')
 
+__version__: str
+
 
 class TErrorOptions(TypedDict):
     all: str
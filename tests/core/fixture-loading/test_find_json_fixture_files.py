@@ -0,0 +1,37 @@
+from wasm.tools.fixtures.loading import (
+    find_json_fixture_files,
+)
+
+
+def _names(fixture_paths):
+    return sorted(fixture_path.name for fixture_path in fixture_paths)
+
+
+def test_find_json_fixture_files_follows_symlinked_directories(tmp_path):
+    fixtures_dir = tmp_path / "fixtures"
+    fixtures_dir.mkdir()
+    (fixtures_dir / "a.json").write_text("{}")
+    linked_dir = tmp_path / "linked"
+    linked_dir.mkdir()
+    (linked_dir / "b.json").write_text("{}")
+    (fixtures_dir / "link").symlink_to(linked_dir, target_is_directory=True)
+
+    assert _names(find_json_fixture_files(fixtures_dir)) == ["a.json", "b.json"]
+
+
+def test_find_json_fixture_files_skips_directories_named_json(tmp_path):
+    (tmp_path / "a.json").write_text("{}")
+    (tmp_path / "dir.json").mkdir()
+    linked_dir = tmp_path / "linked"
+    linked_dir.mkdir()
+    (tmp_path / "link.json").symlink_to(linked_dir, target_is_directory=True)
+
+    assert _names(find_json_fixture_files(tmp_path)) == ["a.json"]
+
+
+def test_find_json_fixture_files_terminates_on_symlink_cycle(tmp_path):
+    (tmp_path / "a.json").write_text("{}")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "parent").symlink_to(tmp_path, target_is_directory=True)
+
+    assert _names(find_json_fixture_files(tmp_path)) == ["a.json"]
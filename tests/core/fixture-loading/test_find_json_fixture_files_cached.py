@@ -0,0 +1,67 @@
+from wasm.tools.fixtures import (
+    generation,
+)
+from wasm.tools.fixtures.generation import (
+    find_json_fixture_files_cached,
+)
+
+
+class DictCache:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key, default):
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+class FakeConfig:
+    def __init__(self):
+        self.cache = DictCache()
+
+
+def _names(fixture_paths):
+    return sorted(fixture_path.name for fixture_path in fixture_paths)
+
+
+def test_find_json_fixture_files_cached_reuses_index(tmp_path, monkeypatch):
+    (tmp_path / "a.json").write_text("{}")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.json").write_text("{}")
+    config = FakeConfig()
+
+    assert _names(find_json_fixture_files_cached(config, tmp_path)) == ["a.json", "b.json"]
+
+    def fail_scan(fixtures_dir):
+        raise AssertionError("fixture tree was scanned again")
+
+    monkeypatch.setattr(generation, 'scan_json_fixture_files', fail_scan)
+    assert _names(find_json_fixture_files_cached(config, tmp_path)) == ["a.json", "b.json"]
+
+
+def test_find_json_fixture_files_cached_sees_new_file_in_subdirectory(tmp_path):
+    (tmp_path / "a.json").write_text("{}")
+    (tmp_path / "sub").mkdir()
+    config = FakeConfig()
+
+    assert _names(find_json_fixture_files_cached(config, tmp_path)) == ["a.json"]
+
+    (tmp_path / "sub" / "new.json").write_text("{}")
+
+    assert _names(find_json_fixture_files_cached(config, tmp_path)) == ["a.json", "new.json"]
+
+
+def test_find_json_fixture_files_cached_sees_removed_subdirectory(tmp_path):
+    (tmp_path / "a.json").write_text("{}")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.json").write_text("{}")
+    config = FakeConfig()
+
+    assert _names(find_json_fixture_files_cached(config, tmp_path)) == ["a.json", "b.json"]
+
+    (tmp_path / "sub" / "b.json").unlink()
+    (tmp_path / "sub").rmdir()
+
+    assert _names(find_json_fixture_files_cached(config, tmp_path)) == ["a.json"]
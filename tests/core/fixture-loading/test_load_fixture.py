@@ -0,0 +1,112 @@
+import json
+from pathlib import (
+    Path,
+)
+
+from wasm.tools.fixtures import (
+    loading,
+)
+from wasm.tools.fixtures.datatypes import (
+    ModuleCommand,
+)
+from wasm.tools.fixtures.loading import (
+    load_fixture,
+)
+from wasm.tools.fixtures.normalizers import (
+    normalize_fixture,
+)
+
+FIXTURE_PATH = Path(__file__).parents[2] / "spec" / "fixtures" / "forward.wast.json"
+
+
+def _normalize_uncached(fixture_path):
+    with fixture_path.open('r') as fixture_file:
+        raw_fixture = json.load(fixture_file)
+    return normalize_fixture(fixture_path.parent, raw_fixture)
+
+
+def _fail_normalize(base_fixtures_dir, raw_fixture):
+    raise AssertionError("fixture was normalized again")
+
+
+def _cache_files(cache_dir):
+    return tuple(path for path in cache_dir.rglob('*') if path.is_file())
+
+
+def test_load_fixture_populates_and_reuses_cache(tmp_path, monkeypatch):
+    expected = _normalize_uncached(FIXTURE_PATH)
+
+    first = load_fixture(FIXTURE_PATH, cache_dir=tmp_path)
+    assert first == expected
+
+    cache_files = _cache_files(tmp_path)
+    assert len(cache_files) == 1
+    assert cache_files[0].suffix == '.pickle'
+
+    monkeypatch.setattr(loading, 'normalize_fixture', _fail_normalize)
+    second = load_fixture(FIXTURE_PATH, cache_dir=tmp_path)
+    assert second == expected
+    assert _cache_files(tmp_path) == cache_files
+
+
+def test_load_fixture_ignores_corrupt_cache(tmp_path):
+    load_fixture(FIXTURE_PATH, cache_dir=tmp_path)
+    cache_file, = _cache_files(tmp_path)
+    cache_file.write_bytes(b'not a pickle')
+
+    assert load_fixture(FIXTURE_PATH, cache_dir=tmp_path) == _normalize_uncached(FIXTURE_PATH)
+
+
+def test_load_fixture_replaces_entry_of_edited_fixture(tmp_path):
+    fixture_path = tmp_path / "fixtures" / FIXTURE_PATH.name
+    fixture_path.parent.mkdir()
+    fixture_path.write_bytes(FIXTURE_PATH.read_bytes())
+    cache_dir = tmp_path / "cache"
+
+    load_fixture(fixture_path, cache_dir=cache_dir)
+    cache_file, = _cache_files(cache_dir)
+
+    raw_fixture = json.loads(fixture_path.read_text())
+    raw_fixture['commands'] = raw_fixture['commands'][:1]
+    fixture_path.write_text(json.dumps(raw_fixture))
+
+    fixture = load_fixture(fixture_path, cache_dir=cache_dir)
+    assert len(fixture.commands) == 1
+    assert _cache_files(cache_dir) == (cache_file,)
+
+
+def test_load_fixture_removes_stale_fingerprints(tmp_path):
+    stale_dir = tmp_path / ("0" * 32)
+    stale_dir.mkdir()
+    (stale_dir / "stale.pickle").write_bytes(b'')
+
+    unrelated_dir = tmp_path / "unrelated"
+    unrelated_dir.mkdir()
+    unrelated_file = tmp_path / ("1" * 32)
+    unrelated_file.write_bytes(b'')
+
+    load_fixture(FIXTURE_PATH, cache_dir=tmp_path)
+
+    assert not stale_dir.exists()
+    assert unrelated_dir.exists()
+    assert unrelated_file.exists()
+    assert len(_cache_files(tmp_path)) == 2
+
+
+def test_load_fixture_from_different_working_directories(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+
+    monkeypatch.chdir(FIXTURE_PATH.parents[2])
+    first = load_fixture(FIXTURE_PATH.relative_to(FIXTURE_PATH.parents[2]), cache_dir=cache_dir)
+
+    monkeypatch.chdir(FIXTURE_PATH.parents[1])
+    second = load_fixture(FIXTURE_PATH.relative_to(FIXTURE_PATH.parents[1]), cache_dir=cache_dir)
+
+    assert first == second
+    module_paths = tuple(
+        command.file_path
+        for command in second.commands
+        if isinstance(command, ModuleCommand)
+    )
+    assert module_paths
+    assert all(module_path.exists() for module_path in module_paths)
@@ -0,0 +1,75 @@
+import numpy
+import pytest
+
+from wasm import (
+    Runtime,
+)
+from wasm.tools.fixtures.datatypes import (
+    Action,
+)
+from wasm.tools.fixtures.modules import (
+    instantiate_test_module,
+)
+from wasm.tools.fixtures.runner import (
+    get_export_index,
+    run_opcode_action_get,
+    run_opcode_action_invoke,
+)
+
+
+@pytest.fixture
+def runtime():
+    runtime = Runtime()
+    runtime.register_module("test", instantiate_test_module(runtime.store))
+    return runtime
+
+
+def _action(action_type, field):
+    return Action(type=action_type, field=field, module=None, args=(), arg_values=())
+
+
+def test_export_index_lookup(runtime):
+    module = runtime.get_module("test")
+    export_index = get_export_index(module, {})
+
+    assert tuple(export_index.values()) == module.exports
+    assert export_index["func"].is_function
+    assert not export_index["global-i32"].is_function
+
+
+def test_export_index_is_reused(runtime):
+    module = runtime.get_module("test")
+    export_indexes = {}
+
+    export_index = get_export_index(module, export_indexes)
+
+    assert export_indexes == {id(module): (module, export_index)}
+    assert get_export_index(module, export_indexes) is export_index
+
+
+def test_invoke_function_export(runtime):
+    module = runtime.get_module("test")
+
+    assert run_opcode_action_invoke(_action('invoke', 'func'), module, {}, runtime, {}) == ()
+
+
+def test_invoke_non_function_export(runtime):
+    module = runtime.get_module("test")
+
+    with pytest.raises(Exception, match="No function found by name: global-i32"):
+        run_opcode_action_invoke(_action('invoke', 'global-i32'), module, {}, runtime, {})
+
+
+def test_invoke_missing_export(runtime):
+    module = runtime.get_module("test")
+
+    with pytest.raises(Exception, match="No function found by name: missing"):
+        run_opcode_action_invoke(_action('invoke', 'missing'), module, {}, runtime, {})
+
+
+def test_get_global_export(runtime):
+    module = runtime.get_module("test")
+
+    assert run_opcode_action_get(_action('get', 'global-i32'), module, {}, runtime, {}) == (
+        numpy.uint32(666),
+    )
@@ -0,0 +1,60 @@
+import numpy
+
+from wasm.datatypes import (
+    FunctionAddress,
+    FunctionType,
+    GlobalAddress,
+    GlobalInstance,
+    GlobalType,
+    HostFunction,
+    Mutability,
+    Store,
+    ValType,
+)
+
+
+def noop(config, args):
+    return ()
+
+
+def test_allocate_host_functions():
+    store = Store()
+    store.allocate_host_function(FunctionType((), ()), noop)
+
+    function_types = (
+        FunctionType((ValType.i32,), ()),
+        FunctionType((), (ValType.f64,)),
+    )
+    function_addresses = store.allocate_host_functions(
+        (function_type, noop) for function_type in function_types
+    )
+
+    assert function_addresses == (FunctionAddress(1), FunctionAddress(2))
+    assert all(isinstance(address, FunctionAddress) for address in function_addresses)
+    assert store.funcs[1:] == [
+        HostFunction(function_types[0], noop),
+        HostFunction(function_types[1], noop),
+    ]
+
+
+def test_allocate_host_functions_empty():
+    store = Store()
+    assert store.allocate_host_functions(()) == ()
+    assert store.funcs == []
+
+
+def test_allocate_globals():
+    store = Store()
+    store.allocate_global(GlobalType(Mutability.var, ValType.i64), numpy.uint64(1))
+
+    global_addresses = store.allocate_globals((
+        (GlobalType(Mutability.const, ValType.i32), numpy.uint32(666)),
+        (GlobalType(Mutability.var, ValType.f32), numpy.float32(0.5)),
+    ))
+
+    assert global_addresses == (GlobalAddress(1), GlobalAddress(2))
+    assert all(isinstance(address, GlobalAddress) for address in global_addresses)
+    assert store.globals[1:] == [
+        GlobalInstance(ValType.i32, numpy.uint32(666), Mutability.const),
+        GlobalInstance(ValType.f32, numpy.float32(0.5), Mutability.var),
+    ]
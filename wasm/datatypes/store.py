@@ -155,6 +155,23 @@ class Store:
         self.funcs.append(function_instance)
         return function_address
 
+    def allocate_host_functions(self,
+                                host_functions: Iterable[Tuple[FunctionType, HostFunctionCallable]],
+                                ) -> Tuple[FunctionAddress, ...]:
+        """
+        Allocate multiple host functions in a single batch, returning their
+        addresses in the same order they were provided.
+        """
+        next_function_address = len(self.funcs)
+        self.funcs.extend(
+            HostFunction(function_type, hostfunc)
+            for function_type, hostfunc in host_functions
+        )
+        return tuple(
+            FunctionAddress(addr)
+            for addr in range(next_function_address, len(self.funcs))
+        )
+
     def validate_function_address(self, address: FunctionAddress) -> None:
         if address >= len(self.funcs):
             raise ValidationError(
@@ -206,6 +223,23 @@ class Store:
         self.globals.append(global_instance)
         return global_address
 
+    def allocate_globals(self,
+                         globals_: Iterable[Tuple[GlobalType, TValue]],
+                         ) -> Tuple[GlobalAddress, ...]:
+        """
+        Allocate multiple globals in a single batch, returning their addresses
+        in the same order they were provided.
+        """
+        next_global_address = len(self.globals)
+        self.globals.extend(
+            GlobalInstance(global_type.valtype, value, global_type.mut)
+            for global_type, value in globals_
+        )
+        return tuple(
+            GlobalAddress(addr)
+            for addr in range(next_global_address, len(self.globals))
+        )
+
     def validate_global_address(self, address: GlobalAddress) -> None:
         if address >= len(self.globals):
             raise ValidationError(
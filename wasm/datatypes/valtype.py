@@ -104,11 +104,11 @@ class ValType(enum.Enum):
 
     @property
     def is_integer_type(self) -> bool:
-        return self in {self.i32, self.i64}
+        return self is self.i32 or self is self.i64
 
     @property
     def is_float_type(self) -> bool:
-        return self in {self.f32, self.f64}
+        return self is self.f32 or self is self.f64
 
     @property
     def bit_size(self) -> BitSize:
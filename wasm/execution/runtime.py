@@ -212,6 +212,13 @@ class Runtime:
         """
         return self.modules[name]
 
+    def snapshot_modules(self) -> Dict[str, ModuleInstance]:
+        """
+        Return a shallow copy of the modules currently registered in this
+        runtime which can be modified without affecting the runtime.
+        """
+        return dict(self.modules)
+
     def _get_import_addresses(self, imports: Tuple[Import, ...]) -> Tuple[TAddress, ...]:
         return _get_import_addresses(self, imports)
 
@@ -1,3 +1,4 @@
+import enum
 from pathlib import (
     Path,
 )
@@ -36,9 +37,21 @@ class canonical_nan:
     pass
 
 
+class ExpectedKind(enum.IntEnum):
+    """
+    How a returned value is checked against an `Expected` value.  The values
+    index into the runner's table of checks.
+    """
+    integer = 0
+    float = 1
+    canonical_nan = 2
+    arithmetic_nan = 3
+
+
 class Expected(NamedTuple):
     valtype: ValType
     value: Union[None, TValue, Type[arithmetic_nan], Type[canonical_nan]]
+    kind: ExpectedKind
 
 
 class Action(NamedTuple):
@@ -46,6 +59,8 @@ class Action(NamedTuple):
     field: str
     module: Optional[str]
     args: Tuple[Argument, ...]
+    # The bare values of `args`, ready to be passed to `Runtime.invoke_function`
+    arg_values: Tuple[TValue, ...]
 
 
 class AssertReturnCommand(NamedTuple):
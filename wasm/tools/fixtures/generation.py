@@ -1,8 +1,10 @@
+import os
 from pathlib import (
     Path,
 )
 from typing import (
     Any,
+    Dict,
     Iterable,
     Tuple,
 )
@@ -13,6 +15,7 @@ from wasm._utils.decorators import (
 
 from .loading import (
     find_json_fixture_files,
+    scan_json_fixture_files,
 )
 
 
@@ -31,6 +34,54 @@ SLOW_FIXTURES = {
 }
 
 
+FIXTURE_INDEX_CACHE_KEY = 'wasm/fixture_index'
+
+
+def _fixture_dirs_unchanged(fixtures_dir: Path, dir_mtimes: Dict[str, int]) -> bool:
+    try:
+        return all(
+            os.stat(fixtures_dir / relative_dir).st_mtime_ns == mtime_ns
+            for relative_dir, mtime_ns in dir_mtimes.items()
+        )
+    except OSError:
+        return False
+
+
+def find_json_fixture_files_cached(config: Any, fixtures_dir: Path) -> Tuple[Path, ...]:
+    """
+    Return the JSON fixture files found under `fixtures_dir`, re-using the
+    index stored in the pytest cache by a previous session as long as none of
+    the directories walked to build it have been modified since.
+    """
+    cache = getattr(config, 'cache', None)
+    if cache is None:
+        return find_json_fixture_files(fixtures_dir)
+
+    fixtures_dir_str = str(fixtures_dir.resolve())
+
+    fixture_index = cache.get(FIXTURE_INDEX_CACHE_KEY, None)
+    if fixture_index is not None and fixture_index.get('fixtures_dir') == fixtures_dir_str:
+        if _fixture_dirs_unchanged(fixtures_dir, fixture_index['dir_mtimes']):
+            return tuple(
+                fixtures_dir / relative_path
+                for relative_path in fixture_index['fixture_files']
+            )
+
+    all_fixture_paths, dir_mtimes = scan_json_fixture_files(fixtures_dir)
+    cache.set(FIXTURE_INDEX_CACHE_KEY, {
+        'fixtures_dir': fixtures_dir_str,
+        'dir_mtimes': {
+            os.path.relpath(dir_path, fixtures_dir): mtime_ns
+            for dir_path, mtime_ns in dir_mtimes.items()
+        },
+        'fixture_files': [
+            os.path.relpath(fixture_path, fixtures_dir)
+            for fixture_path in all_fixture_paths
+        ],
+    })
+    return all_fixture_paths
+
+
 @to_tuple
 def mark_fixtures(all_fixture_paths: Tuple[Path, ...],
                   skip_slow: bool) -> Iterable[Path]:
@@ -54,7 +105,7 @@ def generate_fixture_tests(metafunc: Any,
     """
     if 'fixture_path' in metafunc.fixturenames:
         all_fixture_paths = mark_fixtures(
-            all_fixture_paths=find_json_fixture_files(fixtures_dir),
+            all_fixture_paths=find_json_fixture_files_cached(metafunc.config, fixtures_dir),
             skip_slow=skip_slow,
         )
         if len(all_fixture_paths) == 0:
@@ -1,11 +1,187 @@
+import functools
+import hashlib
+import logging
+import os
 from pathlib import (
     Path,
 )
+import pickle
+import re
+import shutil
+import sys
 from typing import (
+    Dict,
+    List,
+    Optional,
+    Set,
     Tuple,
 )
 
+import numpy
+
+from .datatypes import (
+    Fixture,
+)
+from .normalizers import (
+    normalize_fixture,
+)
+
+# `orjson` decodes the larger spec fixtures considerably faster than the
+# standard library when it happens to be installed.
+try:
+    from orjson import (
+        loads as json_loads,
+    )
+except ImportError:
+    from json import (  # type: ignore
+        loads as json_loads,
+    )
+
+logger = logging.getLogger("wasm.tools.fixtures.loading")
+
+
+def scan_json_fixture_files(fixtures_base_dir: Path) -> Tuple[Tuple[Path, ...], Dict[str, int]]:
+    """
+    Return the JSON fixture files found under `fixtures_base_dir` along with
+    the modification time of every directory that was walked, keyed by the
+    directory path.
+    """
+    # `os.scandir` exposes the file type from the directory listing which
+    # avoids the additional `stat` and pattern matching `Path.glob` does for
+    # every entry.  Directories are walked with an explicit stack rather than
+    # through recursion.  Symlinked directories are followed, and each
+    # directory is only walked once so that symlink cycles terminate.
+    all_fixture_paths: List[Path] = []
+    dir_mtimes: Dict[str, int] = {}
+    visited_dirs: Set[Tuple[int, int]] = set()
+    pending_dirs = [str(fixtures_base_dir)]
+
+    while pending_dirs:
+        dir_path = pending_dirs.pop()
+        # The modification time is read before listing so that an entry
+        # added during the scan shows up as a change on the next check.
+        dir_stat = os.stat(dir_path)
+        if (dir_stat.st_dev, dir_stat.st_ino) in visited_dirs:
+            continue
+        visited_dirs.add((dir_stat.st_dev, dir_stat.st_ino))
+        dir_mtimes[dir_path] = dir_stat.st_mtime_ns
+
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    pending_dirs.append(entry.path)
+                elif entry.name.endswith('.json') and entry.is_file():
+                    all_fixture_paths.append(Path(entry.path))
+
+    return tuple(all_fixture_paths), dir_mtimes
+
 
 def find_json_fixture_files(fixtures_base_dir: Path) -> Tuple[Path, ...]:
-    all_fixture_paths = tuple(fixtures_base_dir.glob('**/*.json'))
+    all_fixture_paths, _ = scan_json_fixture_files(fixtures_base_dir)
     return all_fixture_paths
+
+
+def get_fixture_cache_dir() -> Path:
+    """
+    Return the directory normalized fixtures are cached in, honoring
+    `XDG_CACHE_HOME` when it is set.
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME')
+    if cache_home:
+        return Path(cache_home) / 'py-wasm' / 'fixtures'
+    else:
+        return Path.home() / '.cache' / 'py-wasm' / 'fixtures'
+
+
+# Sources, relative to the `wasm` package, that determine the values held by a
+# normalized fixture.
+FINGERPRINT_SOURCES = (
+    'tools/fixtures/datatypes.py',
+    'tools/fixtures/normalizers.py',
+    'datatypes/bit_size.py',
+    'datatypes/valtype.py',
+    'typing.py',
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_normalizer_fingerprint() -> str:
+    # Any change to how fixtures are normalized or represented has to
+    # invalidate the previously cached fixtures.  The normalized values are
+    # numpy scalars so the numpy version is part of the fingerprint as well.
+    package_dir = Path(__file__).parents[2]
+    fingerprint = hashlib.blake2b(digest_size=16)
+    fingerprint.update(f"{sys.version}|{numpy.__version__}".encode())
+    for source_name in FINGERPRINT_SOURCES:
+        fingerprint.update((package_dir / source_name).read_bytes())
+    return fingerprint.hexdigest()
+
+
+FINGERPRINT_DIR_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+
+def _remove_stale_cache_dirs(cache_dir: Path, fingerprint: str) -> None:
+    # Entries written by a different version of the normalization code can
+    # never be read again.  Only directories named like a fingerprint are
+    # removed since `cache_dir` may be shared with unrelated files.
+    for entry in cache_dir.iterdir():
+        if entry.name == fingerprint:
+            continue
+        elif FINGERPRINT_DIR_PATTERN.fullmatch(entry.name) and entry.is_dir():
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def load_fixture(fixture_path: Path, cache_dir: Optional[Path] = None) -> Fixture:
+    """
+    Load and normalize the JSON fixture found at `fixture_path`.
+
+    Normalized fixtures are pickled into `cache_dir` along with a digest of the
+    raw fixture contents so that subsequent loads of an unchanged fixture skip
+    both JSON decoding and normalization.  Each fixture path has at most one
+    cache entry, and entries written by other versions of the normalization
+    code are removed.  Checkouts or interpreters with different normalization
+    fingerprints should therefore not share a `cache_dir`, as each of them
+    discards the entries of the others when it first populates the cache.
+
+    The fixture path is resolved before normalization so that the module paths
+    held by a cached fixture are valid regardless of the working directory.
+    """
+    if cache_dir is None:
+        cache_dir = get_fixture_cache_dir()
+
+    fixture_path = fixture_path.resolve()
+    raw_fixture_bytes = fixture_path.read_bytes()
+    fixture_digest = hashlib.blake2b(raw_fixture_bytes).digest()
+
+    fingerprint = _get_normalizer_fingerprint()
+    entries_dir = cache_dir / fingerprint
+    path_key = hashlib.blake2b(os.fsencode(fixture_path), digest_size=16)
+    cache_path = entries_dir / f"{path_key.hexdigest()}.pickle"
+
+    try:
+        with cache_path.open('rb') as cache_file:
+            cached_digest, cached_fixture = pickle.load(cache_file)
+    except FileNotFoundError:
+        pass
+    except Exception:
+        logger.debug("Ignoring unreadable fixture cache: %s", cache_path, exc_info=True)
+    else:
+        if cached_digest == fixture_digest:
+            return cached_fixture
+
+    fixture = normalize_fixture(fixture_path.parent, json_loads(raw_fixture_bytes))
+
+    # Write to a temporary file first so that concurrent test processes never
+    # observe a partially written cache entry.
+    tmp_cache_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        if not entries_dir.is_dir():
+            entries_dir.mkdir(parents=True, exist_ok=True)
+            _remove_stale_cache_dirs(cache_dir, fingerprint)
+        with tmp_cache_path.open('wb') as cache_file:
+            pickle.dump((fixture_digest, fixture), cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_cache_path, cache_path)
+    except OSError:
+        logger.debug("Unable to write fixture cache: %s", cache_path, exc_info=True)
+
+    return fixture
@@ -1,5 +1,7 @@
+import itertools
 import logging
 from typing import (
+    Iterable,
     Tuple,
 )
 
@@ -21,6 +23,9 @@ from wasm.datatypes import (
     TableType,
     ValType,
 )
+from wasm.datatypes.function import (
+    HostFunctionCallable,
+)
 from wasm.execution import (
     Configuration,
 )
@@ -29,163 +34,198 @@ from wasm.typing import (
 )
 
 
-def instantiate_spectest_module(store: Store) -> ModuleInstance:
-    logger = logging.getLogger("wasm.tools.fixtures.modules.spectest")
+def _allocate_host_module(store: Store,
+                          host_functions: Iterable[Tuple[FunctionType, HostFunctionCallable]],
+                          memory_type: MemoryType,
+                          globals_: Tuple[Tuple[GlobalType, TValue], ...],
+                          table_type: TableType) -> None:
+    """
+    Allocate the functions, memory, globals and table backing one of the host
+    modules into the store.
+    """
+    store.allocate_host_functions(host_functions)
+    store.allocate_memory(memory_type)
+    store.allocate_globals(globals_)
+    store.allocate_table(table_type)
+
+
+logger = logging.getLogger("wasm.tools.fixtures.modules.spectest")
+
 
-    def spectest__print_i32(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
+def spectest__print_i32(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
+    if logger.isEnabledFor(logging.DEBUG):
         logger.debug('print_i32: %s', args)
-        return tuple()
+    return ()
 
-    def spectest__print_i64(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
+
+def spectest__print_i64(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
+    if logger.isEnabledFor(logging.DEBUG):
         logger.debug('print_i64: %s', args)
-        return tuple()
+    return ()
+
 
-    def spectest__print_f32(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
+def spectest__print_f32(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
+    if logger.isEnabledFor(logging.DEBUG):
         logger.debug('print_f32: %s', args)
-        return tuple()
+    return ()
 
-    def spectest__print_f64(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
+
+def spectest__print_f64(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
+    if logger.isEnabledFor(logging.DEBUG):
         logger.debug('print_f64: %s', args)
-        return tuple()
+    return ()
+
 
-    def spectest__print_i32_f32(config: Configuration,
-                                args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
+def spectest__print_i32_f32(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
+    if logger.isEnabledFor(logging.DEBUG):
         logger.debug('print_i32_f32: %s', args)
-        return tuple()
+    return ()
 
-    def spectest__print_f64_f64(config: Configuration,
-                                args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
+
+def spectest__print_f64_f64(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
+    if logger.isEnabledFor(logging.DEBUG):
         logger.debug('print_f64_f64: %s', args)
-        return tuple()
+    return ()
+
 
-    def spectest__print(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
+def spectest__print(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
+    if logger.isEnabledFor(logging.DEBUG):
         logger.debug('print: %s', args)
-        return tuple()
-
-    store.allocate_host_function(FunctionType((ValType.i32,), ()), spectest__print_i32)
-    store.allocate_host_function(FunctionType((ValType.i64,), ()), spectest__print_i64)
-    store.allocate_host_function(FunctionType((ValType.f32,), ()), spectest__print_f32)
-    store.allocate_host_function(FunctionType((ValType.f64,), ()), spectest__print_f64)
-    store.allocate_host_function(
-        FunctionType((ValType.i32, ValType.f32), ()),
-        spectest__print_i32_f32
-    )
-    store.allocate_host_function(
-        FunctionType((ValType.f64, ValType.f64), ()),
-        spectest__print_f64_f64
-    )
-    store.allocate_host_function(FunctionType((), ()), spectest__print)
+    return ()
 
-    # min:1,max:2 required by import.wast:
-    store.allocate_memory(MemoryType(numpy.uint32(1), numpy.uint32(2)))
 
-    # 666 required by import.wast
-    store.allocate_global(GlobalType(Mutability.const, ValType.i32), numpy.uint32(666))
-
-    store.allocate_global(GlobalType(Mutability.const, ValType.f32), numpy.float32(0.0))
-    store.allocate_global(GlobalType(Mutability.const, ValType.f64), numpy.float64(0.0))
-    store.allocate_table(
-        TableType(Limits(numpy.uint32(10), numpy.uint32(20)), FunctionAddress)
-    )  # max was 30, changed to 20 for import.wast
-    moduleinst = ModuleInstance(
-        types=(
-            FunctionType((ValType.i32,), ()),
-            FunctionType((ValType.i64,), ()),
-            FunctionType((ValType.f32,), ()),
-            FunctionType((ValType.f64,), ()),
-            FunctionType((ValType.i32, ValType.f32), ()),
-            FunctionType((ValType.f64, ValType.f64), ()),
-            FunctionType((), ()),
-        ),
-        func_addrs=tuple(FunctionAddress(idx) for idx in range(7)),
-        table_addrs=(TableAddress(0),),
-        memory_addrs=(MemoryAddress(0),),
-        global_addrs=(GlobalAddress(0), GlobalAddress(1)),
-        exports=(
-            ExportInstance("print_i32", FunctionAddress(0)),
-            ExportInstance("print_i64", FunctionAddress(1)),
-            ExportInstance("print_f32", FunctionAddress(2)),
-            ExportInstance("print_f64", FunctionAddress(3)),
-            ExportInstance("print_i32_f32", FunctionAddress(4)),
-            ExportInstance("print_f64_f64", FunctionAddress(5)),
-            ExportInstance("print", FunctionAddress(6)),
-            ExportInstance("memory", MemoryAddress(0)),
-            ExportInstance("global_i32", GlobalAddress(0)),
-            ExportInstance("global_f32", GlobalAddress(1)),
-            ExportInstance("global_f64", GlobalAddress(2)),
-            ExportInstance("table", TableAddress(0)),
-        ),
-    )
-    return moduleinst
+SPECTEST_FUNCTION_TYPES = (
+    FunctionType((ValType.i32,), ()),
+    FunctionType((ValType.i64,), ()),
+    FunctionType((ValType.f32,), ()),
+    FunctionType((ValType.f64,), ()),
+    FunctionType((ValType.i32, ValType.f32), ()),
+    FunctionType((ValType.f64, ValType.f64), ()),
+    FunctionType((), ()),
+)
+SPECTEST_HOST_FUNCTIONS = (
+    spectest__print_i32,
+    spectest__print_i64,
+    spectest__print_f32,
+    spectest__print_f64,
+    spectest__print_i32_f32,
+    spectest__print_f64_f64,
+    spectest__print,
+)
+SPECTEST_FUNCTION_ADDRESSES = tuple(
+    FunctionAddress(idx) for idx in range(len(SPECTEST_FUNCTION_TYPES))
+)
+SPECTEST_EXPORTS = (
+    ExportInstance("print_i32", FunctionAddress(0)),
+    ExportInstance("print_i64", FunctionAddress(1)),
+    ExportInstance("print_f32", FunctionAddress(2)),
+    ExportInstance("print_f64", FunctionAddress(3)),
+    ExportInstance("print_i32_f32", FunctionAddress(4)),
+    ExportInstance("print_f64_f64", FunctionAddress(5)),
+    ExportInstance("print", FunctionAddress(6)),
+    ExportInstance("memory", MemoryAddress(0)),
+    ExportInstance("global_i32", GlobalAddress(0)),
+    ExportInstance("global_f32", GlobalAddress(1)),
+    ExportInstance("global_f64", GlobalAddress(2)),
+    ExportInstance("table", TableAddress(0)),
+)
 
+# min:1,max:2 required by import.wast:
+SPECTEST_MEMORY_TYPE = MemoryType(numpy.uint32(1), numpy.uint32(2))
+SPECTEST_GLOBALS = (
+    # 666 required by import.wast
+    (GlobalType(Mutability.const, ValType.i32), numpy.uint32(666)),
+    (GlobalType(Mutability.const, ValType.f32), numpy.float32(0.0)),
+    (GlobalType(Mutability.const, ValType.f64), numpy.float64(0.0)),
+)
+# max was 30, changed to 20 for import.wast
+SPECTEST_TABLE_TYPE = TableType(Limits(numpy.uint32(10), numpy.uint32(20)), FunctionAddress)
+SPECTEST_TABLE_ADDRESSES = (TableAddress(0),)
+SPECTEST_MEMORY_ADDRESSES = (MemoryAddress(0),)
+SPECTEST_GLOBAL_ADDRESSES = (GlobalAddress(0), GlobalAddress(1))
+
+# Host module instances only hold tuples of addresses which are the same for
+# every store, so each one is built once and shared between instantiations.
+SPECTEST_MODULE = ModuleInstance(
+    types=SPECTEST_FUNCTION_TYPES,
+    func_addrs=SPECTEST_FUNCTION_ADDRESSES,
+    table_addrs=SPECTEST_TABLE_ADDRESSES,
+    memory_addrs=SPECTEST_MEMORY_ADDRESSES,
+    global_addrs=SPECTEST_GLOBAL_ADDRESSES,
+    exports=SPECTEST_EXPORTS,
+)
 
-# this module called "wast" is used by import.wast to test for assert_unlinkable
-def instantiate_test_module(store: Store) -> ModuleInstance:
-    def test__func(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
-        return tuple()
 
-    def test__func_i32(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
-        return tuple()
+def instantiate_spectest_module(store: Store) -> ModuleInstance:
+    _allocate_host_module(
+        store,
+        zip(SPECTEST_FUNCTION_TYPES, SPECTEST_HOST_FUNCTIONS),
+        SPECTEST_MEMORY_TYPE,
+        SPECTEST_GLOBALS,
+        SPECTEST_TABLE_TYPE,
+    )
+    return SPECTEST_MODULE
 
-    def test__func_f32(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
-        return tuple()
 
-    def test__func__i32(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
-        return tuple()
+# All of the functions exported by the "test" module share this no-op
+# implementation.
+def test__func(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
+    return ()
 
-    def test__func__f32(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
-        return tuple()
 
-    def test__func_i32_i32(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
-        return tuple()
+TEST_FUNCTION_TYPES = (
+    FunctionType((), ()),
+    FunctionType((ValType.i32,), ()),
+    FunctionType((ValType.f32,), ()),
+    FunctionType((), (ValType.i32,)),
+    FunctionType((), (ValType.f32,)),
+    FunctionType((ValType.i32,), (ValType.i32,)),
+    FunctionType((ValType.i64,), (ValType.i64,)),
+)
+TEST_FUNCTION_ADDRESSES = tuple(
+    FunctionAddress(idx) for idx in range(len(TEST_FUNCTION_TYPES))
+)
+TEST_EXPORTS = (
+    ExportInstance("func", FunctionAddress(0)),
+    ExportInstance("func_i32", FunctionAddress(1)),
+    ExportInstance("func_f32", FunctionAddress(2)),
+    ExportInstance("func__i32", FunctionAddress(3)),
+    ExportInstance("func__f32", FunctionAddress(4)),
+    ExportInstance("func__i32_i32", FunctionAddress(5)),
+    ExportInstance("func__i64_i64", FunctionAddress(6)),
+    ExportInstance("memory-2-inf", MemoryAddress(0)),
+    ExportInstance("global-i32", GlobalAddress(0)),
+    ExportInstance("global-f32", GlobalAddress(1)),
+    ExportInstance("table-10-inf", TableAddress(0)),
+)
 
-    def test__func_i64_i64(config: Configuration, args: Tuple[TValue, ...]) -> Tuple[TValue, ...]:
-        return tuple()
+TEST_MEMORY_TYPE = MemoryType(numpy.uint32(1), None)
+TEST_GLOBALS = (
+    (GlobalType(Mutability.const, ValType.i32), numpy.uint32(666)),
+    (GlobalType(Mutability.const, ValType.f32), numpy.float32(0.0)),
+)
+TEST_TABLE_TYPE = TableType(Limits(numpy.uint32(10), None), FunctionAddress)
+TEST_TABLE_ADDRESSES = (TableAddress(0),)
+TEST_MEMORY_ADDRESSES = (MemoryAddress(0),)
+TEST_GLOBAL_ADDRESSES = (GlobalAddress(0), GlobalAddress(1))
+
+TEST_MODULE = ModuleInstance(
+    types=TEST_FUNCTION_TYPES,
+    func_addrs=TEST_FUNCTION_ADDRESSES,
+    table_addrs=TEST_TABLE_ADDRESSES,
+    memory_addrs=TEST_MEMORY_ADDRESSES,
+    global_addrs=TEST_GLOBAL_ADDRESSES,
+    exports=TEST_EXPORTS,
+)
 
-    store.allocate_host_function(FunctionType((), ()), test__func)
-    store.allocate_host_function(FunctionType((ValType.i32,), ()), test__func_i32)
-    store.allocate_host_function(FunctionType((ValType.f32,), ()), test__func_f32)
-    store.allocate_host_function(FunctionType((), (ValType.i32,)), test__func__i32)
-    store.allocate_host_function(FunctionType((), (ValType.f32,)), test__func__f32)
-    store.allocate_host_function(
-        FunctionType((ValType.i32,), (ValType.i32,)),
-        test__func_i32_i32,
-    )
-    store.allocate_host_function(
-        FunctionType((ValType.i64,), (ValType.i64,)),
-        test__func_i64_i64,
-    )
 
-    store.allocate_memory(MemoryType(numpy.uint32(1), None))
-    store.allocate_global(GlobalType(Mutability.const, ValType.i32), numpy.uint32(666))
-    store.allocate_global(GlobalType(Mutability.const, ValType.f32), numpy.float32(0.0))
-    store.allocate_table(TableType(Limits(numpy.uint32(10), None), FunctionAddress))
-    moduleinst = ModuleInstance(
-        types=(
-            FunctionType((), ()),
-            FunctionType((ValType.i32,), ()),
-            FunctionType((ValType.f32,), ()),
-            FunctionType((), (ValType.i32,)),
-            FunctionType((), (ValType.f32,)),
-            FunctionType((ValType.i32,), (ValType.i32,)),
-            FunctionType((ValType.i64,), (ValType.i64,)),
-        ),
-        func_addrs=tuple(FunctionAddress(idx) for idx in range(7)),
-        table_addrs=(TableAddress(0),),
-        memory_addrs=(MemoryAddress(0),),
-        global_addrs=(GlobalAddress(0), GlobalAddress(1)),
-        exports=(
-            ExportInstance("func", FunctionAddress(0)),
-            ExportInstance("func_i32", FunctionAddress(1)),
-            ExportInstance("func_f32", FunctionAddress(2)),
-            ExportInstance("func__i32", FunctionAddress(3)),
-            ExportInstance("func__f32", FunctionAddress(4)),
-            ExportInstance("func__i32_i32", FunctionAddress(5)),
-            ExportInstance("func__i64_i64", FunctionAddress(6)),
-            ExportInstance("memory-2-inf", MemoryAddress(0)),
-            ExportInstance("global-i32", GlobalAddress(0)),
-            ExportInstance("global-f32", GlobalAddress(1)),
-            ExportInstance("table-10-inf", TableAddress(0)),
-        ),
+# this module called "wast" is used by import.wast to test for assert_unlinkable
+def instantiate_test_module(store: Store) -> ModuleInstance:
+    _allocate_host_module(
+        store,
+        zip(TEST_FUNCTION_TYPES, itertools.repeat(test__func)),
+        TEST_MEMORY_TYPE,
+        TEST_GLOBALS,
+        TEST_TABLE_TYPE,
     )
-    return moduleinst
+    return TEST_MODULE
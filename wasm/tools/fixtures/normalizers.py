@@ -1,8 +1,10 @@
+import functools
 from pathlib import (
     Path,
 )
 from typing import (  # noqa: F401
     Any,
+    Callable,
     Dict,
     List,
     Optional,
@@ -14,7 +16,6 @@ from typing import (  # noqa: F401
 from mypy_extensions import (
     TypedDict,
 )
-import numpy
 
 from wasm.datatypes import (
     ValType,
@@ -37,6 +38,7 @@ from .datatypes import (
     AssertUninstantiable,
     AssertUnlinkable,
     Expected,
+    ExpectedKind,
     Fixture,
     ModuleCommand,
     Register,
@@ -53,12 +55,31 @@ class empty:
 RawCommand = Dict[str, Any]
 
 
+# The keys each kind of raw JSON object is allowed to contain.  These checks
+# only guard against changes in the fixture format so they are skipped when
+# running under `python -O`.
+MODULE_COMMAND_KEYS = frozenset(('type', 'line', 'filename', 'name'))
+VALUE_KEYS = frozenset(('type', 'value'))
+ACTION_KEYS = frozenset(('type', 'field', 'args', 'module'))
+ACTION_COMMAND_KEYS = frozenset(('type', 'line', 'action', 'expected'))
+ASSERT_TRAP_KEYS = frozenset(('type', 'line', 'action', 'text', 'expected'))
+MODULE_ASSERTION_KEYS = frozenset(('type', 'line', 'filename', 'text', 'module_type'))
+REGISTER_KEYS = frozenset(('type', 'line', 'name', 'as'))
+
+# Resolved up front for the value types which appear throughout the fixtures.
+# Anything else falls back to `ValType.from_str` for its error handling.
+VALTYPES = {
+    raw_type: ValType.from_str(raw_type)
+    for raw_type in ('i32', 'i64', 'f32', 'f64')
+}
+
+
 def normalize_module_command(raw_command: RawCommand,
                              base_fixtures_dir: Path) -> ModuleCommand:
-    expected_keys = {'type', 'line', 'filename', 'name'}
-    extra_keys = set(raw_command.keys()).difference(expected_keys)
-    if extra_keys:
-        raise Exception(f"Unexpected keys: {extra_keys}")
+    if __debug__:
+        extra_keys = raw_command.keys() - MODULE_COMMAND_KEYS
+        if extra_keys:
+            raise Exception(f"Unexpected keys: {extra_keys}")
 
     file_path = base_fixtures_dir / raw_command['filename']
 
@@ -69,26 +90,34 @@ def normalize_module_command(raw_command: RawCommand,
     )
 
 
+# The same handful of constants (zeros, ones, NaN and infinity bit patterns)
+# recur throughout the spec fixtures so the converted values are cached.  The
+# returned numpy scalars are immutable which makes sharing them safe.
+@functools.lru_cache(maxsize=4096)
 def _normalize_raw_value(valtype: ValType, raw_value: int) -> TValue:
-    if valtype.is_integer_type:
+    if valtype is ValType.i32 or valtype is ValType.i64:
         return valtype.value(raw_value)
-    elif valtype.is_float_type:
-        return valtype.unpack_float_bytes(numpy.uint64(raw_value).data)
+    elif valtype is ValType.f32:
+        return valtype.unpack_float_bytes(raw_value.to_bytes(4, 'little'))
+    elif valtype is ValType.f64:
+        return valtype.unpack_float_bytes(raw_value.to_bytes(8, 'little'))
     else:
         raise Exception(f"Unhandled type: {valtype} | value: {raw_value}")
 
 
 def normalize_argument(raw_argument: RawCommand) -> Argument:
-    expected_keys = {'type', 'value'}
-    extra_keys = set(raw_argument.keys()).difference(expected_keys)
-    if extra_keys:
-        raise Exception(f"Unexpected keys: {extra_keys}")
+    if __debug__:
+        extra_keys = raw_argument.keys() - VALUE_KEYS
+        if extra_keys:
+            raise Exception(f"Unexpected keys: {extra_keys}")
 
     raw_type = raw_argument['type']
-    valtype = ValType.from_str(raw_type)
+    try:
+        valtype = VALTYPES[raw_type]
+    except KeyError:
+        valtype = ValType.from_str(raw_type)
 
-    raw_value = int(raw_argument['value'])
-    value = _normalize_raw_value(valtype, raw_value)
+    value = _normalize_raw_value(valtype, int(raw_argument['value']))
 
     return Argument(
         valtype=valtype,
@@ -97,10 +126,10 @@ def normalize_argument(raw_argument: RawCommand) -> Argument:
 
 
 def normalize_action(raw_action: RawCommand) -> Action:
-    expected_keys = {'type', 'field', 'args', 'module'}
-    extra_keys = set(raw_action.keys()).difference(expected_keys)
-    if extra_keys:
-        raise Exception(f"Unexpected keys: {extra_keys}")
+    if __debug__:
+        extra_keys = raw_action.keys() - ACTION_KEYS
+        if extra_keys:
+            raise Exception(f"Unexpected keys: {extra_keys}")
 
     if raw_action['type'] == 'invoke':
         return _normalize_invoke_action(raw_action)
@@ -110,89 +139,116 @@ def normalize_action(raw_action: RawCommand) -> Action:
         raise Exception(f"Unhandled action type: {raw_action['type']}")
 
 
+def _normalize_field(raw_field: str) -> str:
+    # export names may include unicode bytes like \u001b which must be
+    # converted to a unicode string
+    return raw_field.encode('latin1').decode('utf8')
+
+
 def _normalize_get_action(raw_action: RawCommand) -> Action:
     if 'args' in raw_action:
         raise Exception("Unhandled")
     return Action(
         type=raw_action['type'],
-        field=raw_action['field'],
+        field=_normalize_field(raw_action['field']),
         module=raw_action.get('module'),
-        args=tuple(),
+        args=(),
+        arg_values=(),
     )
 
 
 def _normalize_invoke_action(raw_action: RawCommand) -> Action:
+    args = tuple(map(normalize_argument, raw_action['args']))
     return Action(
         type=raw_action['type'],
-        field=raw_action['field'],
+        field=_normalize_field(raw_action['field']),
         module=raw_action.get('module'),
-        args=tuple(
-            normalize_argument(raw_argument)
-            for raw_argument in raw_action['args']
-        ),
+        args=args,
+        arg_values=tuple([arg.value for arg in args]),
     )
 
 
 def normalize_expected(raw_expected: RawCommand) -> Expected:
-    expected_keys = {'type', 'value'}
-    extra_keys = set(raw_expected.keys()).difference(expected_keys)
-    if extra_keys:
-        raise Exception(f"Unexpected keys: {extra_keys}")
+    if __debug__:
+        extra_keys = raw_expected.keys() - VALUE_KEYS
+        if extra_keys:
+            raise Exception(f"Unexpected keys: {extra_keys}")
 
     raw_type = raw_expected['type']
-    valtype = ValType.from_str(raw_type)
+    try:
+        valtype = VALTYPES[raw_type]
+    except KeyError:
+        valtype = ValType.from_str(raw_type)
 
     value: Optional[Union[int, float]]
 
-    if 'value' in raw_expected:
-        value = _normalize_raw_value(valtype, raw_expected['value'])
-    else:
+    raw_value = raw_expected.get('value', empty)
+    if raw_value is empty:
         value = None
+    else:
+        value = _normalize_raw_value(valtype, int(raw_value))
+
+    if valtype is ValType.i32 or valtype is ValType.i64:
+        kind = ExpectedKind.integer
+    else:
+        kind = ExpectedKind.float
 
     return Expected(
         valtype=valtype,
         value=value,
+        kind=kind,
     )
 
 
 def normalize_canonical_nan_expected(raw_expected: RawCommand) -> Expected:
     expected = normalize_expected(raw_expected)
-    return Expected(expected.valtype, canonical_nan)
+    return Expected(expected.valtype, canonical_nan, ExpectedKind.canonical_nan)
 
 
 def normalize_arithmetic_nan_expected(raw_expected: RawCommand) -> Expected:
     expected = normalize_expected(raw_expected)
-    return Expected(expected.valtype, arithmetic_nan)
+    return Expected(expected.valtype, arithmetic_nan, ExpectedKind.arithmetic_nan)
 
 
-def normalize_assert_return_command(raw_command: RawCommand,
-                                    base_fixtures_dir: Path
-                                    ) -> AssertReturnCommand:
-    expected_keys = {'type', 'line', 'action', 'expected'}
-    extra_keys = set(raw_command.keys()).difference(expected_keys)
-    if extra_keys:
-        raise Exception(f"Unexpected keys: {extra_keys}")
+TActionAssertion = TypeVar(
+    "TActionAssertion",
+    AssertReturnCommand,
+    AssertExhaustion,
+    ActionCommand,
+)
+
 
-    return AssertReturnCommand(
+def _normalize_action_assertion(raw_command: RawCommand,
+                                normalized_type: Type[TActionAssertion],
+                                ) -> TActionAssertion:
+    if __debug__:
+        extra_keys = raw_command.keys() - ACTION_COMMAND_KEYS
+        if extra_keys:
+            raise Exception(f"Unexpected keys: {extra_keys}")
+
+    return normalized_type(
         line=raw_command['line'],
         action=normalize_action(raw_command['action']),
-        expected=tuple(
-            normalize_expected(raw_expected)
-            for raw_expected
-            in raw_command['expected']
-        ),
+        expected=tuple(map(normalize_expected, raw_command['expected'])),
     )
 
 
-def normalize_assert_return_canonical_nan(raw_command: RawCommand
-                                          ) -> AssertReturnCanonicalNan:
+def normalize_assert_return_command(raw_command: RawCommand,
+                                    base_fixtures_dir: Path
+                                    ) -> AssertReturnCommand:
+    return _normalize_action_assertion(raw_command, AssertReturnCommand)
+
+
+def normalize_assert_return_canonical_nan(raw_command: RawCommand,
+                                          base_fixtures_dir: Path) -> AssertReturnCanonicalNan:
     return _normalize_assert_return_common_nan(
         raw_command,
         AssertReturnCanonicalNan,
     )
 
 
-def normalize_assert_return_arithmetic_nan(raw_command: RawCommand
+def normalize_assert_return_arithmetic_nan(raw_command: RawCommand,
+                                           base_fixtures_dir: Path
                                            ) -> AssertReturnArithmeticNan:
     return _normalize_assert_return_common_nan(
         raw_command,
@@ -211,67 +267,79 @@ NAN_NORMALIZERS = {
 
 def _normalize_assert_return_common_nan(raw_command: RawCommand,
                                         normalized_type: Type[TReturn]) -> TReturn:
-    expected_keys = {'type', 'line', 'action', 'expected'}
-    extra_keys = set(raw_command.keys()).difference(expected_keys)
-    if extra_keys:
-        raise Exception(f"Unexpected keys: {extra_keys}")
+    if __debug__:
+        extra_keys = raw_command.keys() - ACTION_COMMAND_KEYS
+        if extra_keys:
+            raise Exception(f"Unexpected keys: {extra_keys}")
 
     expected_normalizer_fn = NAN_NORMALIZERS[normalized_type]
 
     return normalized_type(
         line=raw_command['line'],
         action=normalize_action(raw_command['action']),
-        expected=tuple(
-            expected_normalizer_fn(raw_expected)
-            for raw_expected
-            in raw_command['expected']
-        ),
+        expected=tuple(map(expected_normalizer_fn, raw_command['expected'])),
     )
 
 
-def normalize_assert_invalid(raw_command: RawCommand,
-                             base_fixtures_dir: Path) -> AssertInvalidCommand:
-    expected_keys = {'type', 'line', 'filename', 'text', 'module_type'}
-    extra_keys = set(raw_command.keys()).difference(expected_keys)
-    if extra_keys:
-        raise Exception(f"Unexpected keys: {extra_keys}")
+TModuleAssertion = TypeVar(
+    "TModuleAssertion",
+    AssertInvalidCommand,
+    AssertUnlinkable,
+    AssertUninstantiable,
+)
 
-    if raw_command['module_type'] != 'binary':
-        raise ValueError(f"Unsupported module_type: {raw_command['module_type']}")
 
-    file_path = base_fixtures_dir / raw_command['filename']
+def _normalize_binary_module_assertion(raw_command: RawCommand,
+                                       base_fixtures_dir: Path,
+                                       normalized_type: Type[TModuleAssertion],
+                                       ) -> TModuleAssertion:
+    if __debug__:
+        extra_keys = raw_command.keys() - MODULE_ASSERTION_KEYS
+        if extra_keys:
+            raise Exception(f"Unexpected keys: {extra_keys}")
+
+    module_type = raw_command['module_type']
+    if module_type != 'binary':
+        raise ValueError(f"Unsupported module_type: {module_type}")
 
-    return AssertInvalidCommand(
+    return normalized_type(
         line=raw_command['line'],
-        file_path=file_path,
+        file_path=base_fixtures_dir / raw_command['filename'],
         text=raw_command['text'],
-        module_type=raw_command['module_type'],
+        module_type=module_type,
     )
 
 
-def normalize_assert_trap(raw_command: RawCommand) -> AssertTrap:
-    expected_keys = {'type', 'line', 'action', 'text', 'expected'}
-    extra_keys = set(raw_command.keys()).difference(expected_keys)
-    if extra_keys:
-        raise Exception(f"Unexpected keys: {extra_keys}")
+def normalize_assert_invalid(raw_command: RawCommand,
+                             base_fixtures_dir: Path) -> AssertInvalidCommand:
+    return _normalize_binary_module_assertion(
+        raw_command,
+        base_fixtures_dir,
+        AssertInvalidCommand,
+    )
+
+
+def normalize_assert_trap(raw_command: RawCommand,
+                          base_fixtures_dir: Path) -> AssertTrap:
+    if __debug__:
+        extra_keys = raw_command.keys() - ASSERT_TRAP_KEYS
+        if extra_keys:
+            raise Exception(f"Unexpected keys: {extra_keys}")
 
     return AssertTrap(
         line=raw_command['line'],
         action=normalize_action(raw_command['action']),
         text=raw_command['text'],
-        expected=tuple(
-            normalize_expected(raw_expected)
-            for raw_expected in raw_command['expected']
-        ),
+        expected=tuple(map(normalize_expected, raw_command['expected'])),
     )
 
 
 def normalize_assert_malformed(raw_command: RawCommand,
                                base_fixtures_dir: Path) -> AssertMalformed:
-    expected_keys = {'type', 'line', 'filename', 'text', 'module_type'}
-    extra_keys = set(raw_command.keys()).difference(expected_keys)
-    if extra_keys:
-        raise Exception(f"Unexpected keys: {extra_keys}")
+    if __debug__:
+        extra_keys = raw_command.keys() - MODULE_ASSERTION_KEYS
+        if extra_keys:
+            raise Exception(f"Unexpected keys: {extra_keys}")
 
     return AssertMalformed(
         line=raw_command['line'],
@@ -281,45 +349,26 @@ def normalize_assert_malformed(raw_command: RawCommand,
     )
 
 
-def normalize_assert_exhaustion(raw_command: RawCommand) -> AssertExhaustion:
-    expected_keys = {'type', 'line', 'action', 'expected'}
-    extra_keys = set(raw_command.keys()).difference(expected_keys)
-    if extra_keys:
-        raise Exception(f"Unexpected keys: {extra_keys}")
-
-    return AssertExhaustion(
-        line=raw_command['line'],
-        action=normalize_action(raw_command['action']),
-        expected=tuple(
-            normalize_expected(raw_expected)
-            for raw_expected in raw_command['expected']
-        ),
-    )
+def normalize_assert_exhaustion(raw_command: RawCommand,
+                                base_fixtures_dir: Path) -> AssertExhaustion:
+    return _normalize_action_assertion(raw_command, AssertExhaustion)
 
 
 def normalize_assert_unlinkable(raw_command: RawCommand,
                                 base_fixtures_dir: Path) -> AssertUnlinkable:
-    expected_keys = {'type', 'line', 'filename', 'text', 'module_type'}
-    extra_keys = set(raw_command.keys()).difference(expected_keys)
-    if extra_keys:
-        raise Exception(f"Unexpected keys: {extra_keys}")
-
-    if raw_command['module_type'] != 'binary':
-        raise ValueError(f"Unsupported module_type: {raw_command['module_type']}")
-
-    return AssertUnlinkable(
-        line=raw_command['line'],
-        file_path=base_fixtures_dir / raw_command['filename'],
-        text=raw_command['text'],
-        module_type=raw_command['module_type'],
+    return _normalize_binary_module_assertion(
+        raw_command,
+        base_fixtures_dir,
+        AssertUnlinkable,
     )
 
 
-def normalize_register(raw_command: RawCommand) -> Register:
-    expected_keys = {'type', 'line', 'name', 'as'}
-    extra_keys = set(raw_command.keys()).difference(expected_keys)
-    if extra_keys:
-        raise Exception(f"Unexpected keys: {extra_keys}")
+def normalize_register(raw_command: RawCommand,
+                       base_fixtures_dir: Path) -> Register:
+    if __debug__:
+        extra_keys = raw_command.keys() - REGISTER_KEYS
+        if extra_keys:
+            raise Exception(f"Unexpected keys: {extra_keys}")
 
     return Register(
         line=raw_command['line'],
@@ -328,69 +377,47 @@ def normalize_register(raw_command: RawCommand) -> Register:
     )
 
 
-def normalize_action_command(raw_command: RawCommand) -> ActionCommand:
-    expected_keys = {'type', 'line', 'action', 'expected'}
-    extra_keys = set(raw_command.keys()).difference(expected_keys)
-    if extra_keys:
-        raise Exception(f"Unexpected keys: {extra_keys}")
-
-    return ActionCommand(
-        line=raw_command['line'],
-        action=normalize_action(raw_command['action']),
-        expected=tuple(
-            normalize_expected(raw_expected)
-            for raw_expected in raw_command['expected']
-        ),
-    )
+def normalize_action_command(raw_command: RawCommand,
+                             base_fixtures_dir: Path) -> ActionCommand:
+    return _normalize_action_assertion(raw_command, ActionCommand)
 
 
 def normalize_assert_uninstantiable(raw_command: RawCommand,
                                     base_fixtures_dir: Path) -> AssertUninstantiable:
-    expected_keys = {'type', 'line', 'filename', 'text', 'module_type'}
-    extra_keys = set(raw_command.keys()).difference(expected_keys)
-    if extra_keys:
-        raise Exception(f"Unexpected keys: {extra_keys}")
+    return _normalize_binary_module_assertion(
+        raw_command,
+        base_fixtures_dir,
+        AssertUninstantiable,
+    )
 
-    if raw_command['module_type'] != 'binary':
-        raise ValueError(f"Unsupported module_type: {raw_command['module_type']}")
 
-    return AssertUninstantiable(
-        line=raw_command['line'],
-        file_path=base_fixtures_dir / raw_command['filename'],
-        text=raw_command['text'],
-        module_type=raw_command['module_type'],
-    )
+# Every command normalizer takes the same `(raw_command, base_fixtures_dir)`
+# arguments so that they can be dispatched on the raw command type.
+COMMAND_NORMALIZERS: Dict[str, Callable[[RawCommand, Path], TCommand]] = {
+    'module': normalize_module_command,
+    'assert_return': normalize_assert_return_command,
+    'assert_invalid': normalize_assert_invalid,
+    'assert_trap': normalize_assert_trap,
+    'assert_malformed': normalize_assert_malformed,
+    'assert_exhaustion': normalize_assert_exhaustion,
+    'assert_return_canonical_nan': normalize_assert_return_canonical_nan,
+    'assert_return_arithmetic_nan': normalize_assert_return_arithmetic_nan,
+    'assert_unlinkable': normalize_assert_unlinkable,
+    'register': normalize_register,
+    'action': normalize_action_command,
+    'assert_uninstantiable': normalize_assert_uninstantiable,
+}
 
 
 def normalize_command(raw_command: RawCommand,
                       base_fixtures_dir: Path) -> TCommand:
-    if raw_command['type'] == 'module':
-        return normalize_module_command(raw_command, base_fixtures_dir)
-    elif raw_command['type'] == 'assert_return':
-        return normalize_assert_return_command(raw_command, base_fixtures_dir)
-    elif raw_command['type'] == 'assert_invalid':
-        return normalize_assert_invalid(raw_command, base_fixtures_dir)
-    elif raw_command['type'] == 'assert_trap':
-        return normalize_assert_trap(raw_command)
-    elif raw_command['type'] == 'assert_malformed':
-        return normalize_assert_malformed(raw_command, base_fixtures_dir)
-    elif raw_command['type'] == 'assert_exhaustion':
-        return normalize_assert_exhaustion(raw_command)
-    elif raw_command['type'] == 'assert_return_canonical_nan':
-        return normalize_assert_return_canonical_nan(raw_command)
-    elif raw_command['type'] == 'assert_return_arithmetic_nan':
-        return normalize_assert_return_arithmetic_nan(raw_command)
-    elif raw_command['type'] == 'assert_unlinkable':
-        return normalize_assert_unlinkable(raw_command, base_fixtures_dir)
-    elif raw_command['type'] == 'register':
-        return normalize_register(raw_command)
-    elif raw_command['type'] == 'action':
-        return normalize_action_command(raw_command)
-    elif raw_command['type'] == 'assert_uninstantiable':
-        return normalize_assert_uninstantiable(raw_command, base_fixtures_dir)
-    else:
+    try:
+        normalizer_fn = COMMAND_NORMALIZERS[raw_command['type']]
+    except KeyError:
         raise Exception(f"Unknown command type: {raw_command['type']}")
 
+    return normalizer_fn(raw_command, base_fixtures_dir)
+
 
 TRawFixture = TypedDict(
     'TRawFixture',
@@ -404,10 +431,10 @@ TRawFixture = TypedDict(
 def normalize_fixture(base_fixtures_dir: Path,
                       raw_fixture: TRawFixture) -> Fixture:
     file_path = base_fixtures_dir / raw_fixture["source_filename"]
-    commands = tuple(
+    commands = tuple([
         normalize_command(raw_command, base_fixtures_dir)
         for raw_command in raw_fixture['commands']
-    )
+    ])
     return Fixture(
         file_path=file_path,
         commands=commands,
@@ -1,5 +1,3 @@
-import copy
-import json
 import logging
 from pathlib import (
     Path,
@@ -11,11 +9,12 @@ from typing import (
     Dict,
     Optional,
     Tuple,
+    Type,
     Union,
+    cast,
 )
 
 import numpy
-import pytest
 
 from wasm import (
     Runtime,
@@ -25,6 +24,7 @@ from wasm._utils.float import (
     is_canonical_nan,
 )
 from wasm.datatypes import (
+    ExportInstance,
     ModuleInstance,
 )
 from wasm.exceptions import (
@@ -52,11 +52,9 @@ from .datatypes import (
     AssertUnlinkable,
     ModuleCommand,
     Register,
-    arithmetic_nan,
-    canonical_nan,
 )
-from .normalizers import (
-    normalize_fixture,
+from .loading import (
+    load_fixture,
 )
 
 logger = logging.getLogger("wasm.tools.fixtures.runner")
@@ -64,6 +62,25 @@ logger = logging.getLogger("wasm.tools.fixtures.runner")
 
 CurrentModule = Optional[ModuleInstance]
 AllModules = Dict[str, ModuleInstance]
+ExportIndex = Dict[str, ExportInstance]
+# `ModuleInstance` is a `NamedTuple` which can neither carry extra attributes
+# nor be weakly referenced, so the export indexes are keyed by `id()`.  The
+# module is kept alongside its index to ensure the id cannot be reused while
+# the entry exists.  `run_fixture_test` owns one of these for each fixture.
+ExportIndexes = Dict[int, Tuple[ModuleInstance, ExportIndex]]
+
+
+def assert_raises(exception_type: Type[BaseException],
+                  fn: Callable[..., Any],
+                  *args: Any) -> None:
+    """
+    Assert that calling `fn` with the given arguments raises `exception_type`.
+    """
+    try:
+        fn(*args)
+    except exception_type:
+        return
+    raise AssertionError(f"DID NOT RAISE {exception_type}")
 
 
 def instantiate_module_from_wasm_file(file_path: Path,
@@ -77,7 +94,8 @@ def instantiate_module_from_wasm_file(file_path: Path,
 def do_module(command: ModuleCommand,
               module: CurrentModule,
               all_modules: AllModules,
-              runtime: Runtime) -> ModuleInstance:
+              runtime: Runtime,
+              export_indexes: ExportIndexes) -> ModuleInstance:
     if command.file_path is not None:
         module = instantiate_module_from_wasm_file(command.file_path, runtime)
 
@@ -112,52 +130,50 @@ TAnyCommand = Union[
 ]
 
 
+def get_export_index(module: ModuleInstance, export_indexes: ExportIndexes) -> ExportIndex:
+    try:
+        _, export_index = export_indexes[id(module)]
+    except KeyError:
+        export_index = {export.name: export for export in module.exports}
+        export_indexes[id(module)] = (module, export_index)
+    return export_index
+
+
 def run_opcode_action(command: TActionCommands,
                       module: CurrentModule,
                       all_modules: AllModules,
-                      runtime: Runtime) -> Tuple[TValue, ...]:
+                      runtime: Runtime,
+                      export_indexes: ExportIndexes) -> Tuple[TValue, ...]:
     if command.action.module is not None:
         module = all_modules[command.action.module]
 
     if module is None:
         raise Exception("Invariant")
 
-    if command.action.type == "invoke":
-        ret = run_opcode_action_invoke(
-            command.action, module, all_modules, runtime,
-        )
-    elif command.action.type == "get":
-        ret = run_opcode_action_get(
-            command.action, module, all_modules, runtime,
-        )
-    else:
+    try:
+        action_fn = ACTION_FNS[command.action.type]
+    except KeyError:
         raise Exception(f"Unsupported action type: {command.action.type}")
 
-    return ret
+    return action_fn(command.action, module, all_modules, runtime, export_indexes)
 
 
 def run_opcode_action_invoke(action: Action,
                              module: ModuleInstance,
                              all_modules: AllModules,
-                             runtime: Runtime) -> Tuple[TValue, ...]:
-    # get function name, which could include unicode bytes like \u001b which
-    # must be converted to unicode string
-    function_name = action.field.encode('latin1').decode('utf8')
+                             runtime: Runtime,
+                             export_indexes: ExportIndexes) -> Tuple[TValue, ...]:
+    function_name = action.field
 
     # get function address
-    function_address = None
-    for export in module.exports:
-        if export.is_function and export.name == function_name:
-            function_address = export.function_address
-            logger.debug("function_address: %s", function_address)
-            break
-    else:
+    export = get_export_index(module, export_indexes).get(function_name)
+    if export is None or not export.is_function:
         raise Exception(f"No function found by name: {function_name}")
-
-    args = tuple(arg.value for arg in action.args)
+    function_address = export.function_address
+    logger.debug("function_address: %s", function_address)
 
     # invoke func
-    ret = runtime.invoke_function(function_address, tuple(args))
+    ret = runtime.invoke_function(function_address, action.arg_values)
 
     return ret
 
@@ -165,16 +181,64 @@ def run_opcode_action_invoke(action: Action,
 def run_opcode_action_get(action: Action,
                           module: ModuleInstance,
                           all_modules: AllModules,
-                          runtime: Runtime) -> Tuple[TValue, ...]:
+                          runtime: Runtime,
+                          export_indexes: ExportIndexes) -> Tuple[TValue, ...]:
     # this is naive, since test["expected"] is a list, should iterate over each
     # one, but maybe OK since there is only one test["action"]
-    for export in module.exports:
-        if export.name == action.field:
-            globaladdr = export.value
-            value = runtime.store.globals[globaladdr].value
-            return (value,)
-    else:
+    export = get_export_index(module, export_indexes).get(action.field)
+    if export is None:
         raise Exception(f"No export found for name: '{action.field}")
+    globaladdr = export.value
+    value = runtime.store.globals[globaladdr].value
+    return (value,)
+
+
+ActionFn = Callable[
+    [Action, ModuleInstance, AllModules, Runtime, ExportIndexes],
+    Tuple[TValue, ...],
+]
+
+
+ACTION_FNS: Dict[str, ActionFn] = {
+    'invoke': run_opcode_action_invoke,
+    'get': run_opcode_action_get,
+}
+
+
+def check_integer_value(actual: TValue, expected_val: Any) -> None:
+    logger.debug("expected: %s | actual: %s", expected_val, actual)
+    assert isinstance(actual, (numpy.uint32, numpy.uint64))
+
+    assert actual == expected_val
+
+
+def check_float_value(actual: TValue, expected_val: Any) -> None:
+    assert isinstance(actual, (numpy.float32, numpy.float64))
+    assert isinstance(expected_val, (numpy.float32, numpy.float64))
+
+    if numpy.isnan(expected_val):
+        assert numpy.isnan(actual)
+    else:
+        assert expected_val == actual
+
+    assert expected_val.tobytes() == actual.tobytes()
+
+
+def check_canonical_nan(actual: TValue, expected_val: Any) -> None:
+    assert is_canonical_nan(actual)
+
+
+def check_arithmetic_nan(actual: TValue, expected_val: Any) -> None:
+    assert is_arithmetic_nan(actual)
+
+
+# Indexed by `ExpectedKind`
+EXPECTED_VALUE_CHECKS: Tuple[Callable[[TValue, Any], None], ...] = (
+    check_integer_value,
+    check_float_value,
+    check_canonical_nan,
+    check_arithmetic_nan,
+)
 
 
 TDoAssertReturnCommands = Union[
@@ -187,8 +251,9 @@ TDoAssertReturnCommands = Union[
 def do_assert_return(command: TDoAssertReturnCommands,
                      module: CurrentModule,
                      all_modules: AllModules,
-                     runtime: Runtime) -> None:
-    ret = run_opcode_action(command, module, all_modules, runtime)
+                     runtime: Runtime,
+                     export_indexes: ExportIndexes) -> None:
+    ret = run_opcode_action(command, module, all_modules, runtime, export_indexes)
 
     if len(ret) != len(command.expected):
         logger.debug("ret: %s | expected: %s", ret, command.expected)
@@ -199,47 +264,30 @@ def do_assert_return(command: TDoAssertReturnCommands,
     elif len(ret) == 0 and len(command.expected) == 0:
         return
 
-    for idx, (actual, expected) in enumerate(zip(ret, command.expected)):
+    for actual, expected in zip(ret, command.expected):
         expected_val = expected.value
         assert expected_val is not None
-        expected_type = expected.valtype
-        actual_type = type(actual)
-
-        assert actual_type is expected_type.value
-
-        if expected_val is arithmetic_nan:
-            assert is_arithmetic_nan(actual)
-        elif expected_val is canonical_nan:
-            assert is_canonical_nan(actual)
-        elif expected_type.is_integer_type:
-            logger.debug("expected: %s | actual: %s", expected_val, actual)
-            assert isinstance(actual, (numpy.uint32, numpy.uint64))
-
-            assert actual == expected_val
-        elif expected_type.is_float_type:
-            assert isinstance(actual, (numpy.float32, numpy.float64))
-            assert isinstance(expected_val, (numpy.float32, numpy.float64))
-
-            if numpy.isnan(expected_val):
-                assert numpy.isnan(actual)
-            else:
-                assert expected_val == actual
-
-            assert expected_val.tobytes() == actual.tobytes()
-        else:
-            raise AssertionError(f"Unknown expected return type: {expected_type}")
+
+        assert type(actual) is expected.valtype.value
+
+        EXPECTED_VALUE_CHECKS[expected.kind](actual, expected_val)
 
 
 def do_assert_invalid(command: AssertInvalidCommand,
                       module: CurrentModule,
                       all_modules: AllModules,
-                      runtime: Runtime) -> None:
+                      runtime: Runtime,
+                      export_indexes: ExportIndexes) -> None:
     if command.module_type != "binary":
         raise Exception("Unhandled")
 
     if command.file_path:
-        with pytest.raises(InvalidModule):
-            instantiate_module_from_wasm_file(command.file_path, runtime)
+        assert_raises(
+            InvalidModule,
+            instantiate_module_from_wasm_file,
+            command.file_path,
+            runtime,
+        )
     else:
         raise Exception("Unhandled")
 
@@ -247,13 +295,18 @@ def do_assert_invalid(command: AssertInvalidCommand,
 def do_assert_trap(command: AssertTrap,
                    module: CurrentModule,
                    all_modules: AllModules,
-                   runtime: Runtime) -> None:
-    if hasattr(command, 'module'):
-        raise Exception("Unhandled")
-
+                   runtime: Runtime,
+                   export_indexes: ExportIndexes) -> None:
     if command.action:
-        with pytest.raises(Trap):
-            run_opcode_action(command, module, all_modules, runtime)
+        assert_raises(
+            Trap,
+            run_opcode_action,
+            command,
+            module,
+            all_modules,
+            runtime,
+            export_indexes,
+        )
     else:
         raise Exception("Unhandled")
 
@@ -261,7 +314,8 @@ def do_assert_trap(command: AssertTrap,
 def do_assert_malformed(command: AssertMalformed,
                         module: CurrentModule,
                         all_modules: AllModules,
-                        runtime: Runtime) -> None:
+                        runtime: Runtime,
+                        export_indexes: ExportIndexes) -> None:
     if command.module_type == 'text':
         assert not command.file_path.exists()
         logger.info("Skipping command for text_module")
@@ -270,8 +324,12 @@ def do_assert_malformed(command: AssertMalformed,
         raise Exception("Unhandled")
 
     if command.file_path:
-        with pytest.raises(MalformedModule):
-            instantiate_module_from_wasm_file(command.file_path, runtime)
+        assert_raises(
+            MalformedModule,
+            instantiate_module_from_wasm_file,
+            command.file_path,
+            runtime,
+        )
     else:
         raise Exception("Unhandled")
 
@@ -279,13 +337,18 @@ def do_assert_malformed(command: AssertMalformed,
 def do_assert_exhaustion(command: AssertExhaustion,
                          module: CurrentModule,
                          all_modules: AllModules,
-                         runtime: Runtime) -> None:
-    if hasattr(command, 'module'):
-        raise Exception("Unhandled")
-
+                         runtime: Runtime,
+                         export_indexes: ExportIndexes) -> None:
     if command.action:
-        with pytest.raises(Exhaustion):
-            run_opcode_action(command, module, all_modules, runtime)
+        assert_raises(
+            Exhaustion,
+            run_opcode_action,
+            command,
+            module,
+            all_modules,
+            runtime,
+            export_indexes,
+        )
     else:
         raise Exception("Unhandled")
 
@@ -293,21 +356,24 @@ def do_assert_exhaustion(command: AssertExhaustion,
 def do_assert_canonical_nan(command: AssertReturnCanonicalNan,
                             module: CurrentModule,
                             all_modules: AllModules,
-                            runtime: Runtime) -> None:
-    do_assert_return(command, module, all_modules, runtime)
+                            runtime: Runtime,
+                            export_indexes: ExportIndexes) -> None:
+    do_assert_return(command, module, all_modules, runtime, export_indexes)
 
 
 def do_assert_arithmetic_nan(command: AssertReturnArithmeticNan,
                              module: CurrentModule,
                              all_modules: AllModules,
-                             runtime: Runtime) -> None:
-    do_assert_return(command, module, all_modules, runtime)
+                             runtime: Runtime,
+                             export_indexes: ExportIndexes) -> None:
+    do_assert_return(command, module, all_modules, runtime, export_indexes)
 
 
 def do_assert_unlinkable(command: AssertUnlinkable,
                          module: CurrentModule,
                          all_modules: AllModules,
-                         runtime: Runtime) -> None:
+                         runtime: Runtime,
+                         export_indexes: ExportIndexes) -> None:
     if command.module_type == 'text':
         assert not command.file_path.exists()
         logger.info("Skipping command for text_module")
@@ -316,8 +382,12 @@ def do_assert_unlinkable(command: AssertUnlinkable,
         raise Exception("Unhandled")
 
     if command.file_path:
-        with pytest.raises(Unlinkable):
-            instantiate_module_from_wasm_file(command.file_path, runtime)
+        assert_raises(
+            Unlinkable,
+            instantiate_module_from_wasm_file,
+            command.file_path,
+            runtime,
+        )
     else:
         raise Exception("Unhandled")
 
@@ -325,7 +395,8 @@ def do_assert_unlinkable(command: AssertUnlinkable,
 def do_register(command: Register,
                 module: CurrentModule,
                 all_modules: AllModules,
-                runtime: Runtime) -> None:
+                runtime: Runtime,
+                export_indexes: ExportIndexes) -> None:
     if command.name is None:
         if module is None:
             raise Exception("Invariant")
@@ -337,77 +408,82 @@ def do_register(command: Register,
 def do_assert_uninstantiable(command: AssertUninstantiable,
                              module: CurrentModule,
                              all_modules: AllModules,
-                             runtime: Runtime) -> None:
-    with pytest.raises(Trap):
-        instantiate_module_from_wasm_file(command.file_path, runtime)
+                             runtime: Runtime,
+                             export_indexes: ExportIndexes) -> None:
+    assert_raises(
+        Trap,
+        instantiate_module_from_wasm_file,
+        command.file_path,
+        runtime,
+    )
 
 
 CommandFn = Callable[
-    [TAnyCommand, CurrentModule, AllModules, Runtime],
+    [TAnyCommand, CurrentModule, AllModules, Runtime, ExportIndexes],
     Any,
 ]
 
 
-def get_command_fn(command: TAnyCommand) -> CommandFn:
-    if isinstance(command, ModuleCommand):
-        return do_module  # type: ignore
-    elif isinstance(command, AssertReturnCommand):
-        return do_assert_return  # type: ignore
-    elif isinstance(command, AssertInvalidCommand):
-        return do_assert_invalid  # type: ignore
-    elif isinstance(command, AssertExhaustion):
-        return do_assert_exhaustion  # type: ignore
-    elif isinstance(command, AssertMalformed):
-        return do_assert_malformed  # type: ignore
-    elif isinstance(command, AssertTrap):
-        return do_assert_trap  # type: ignore
-    elif isinstance(command, AssertReturnCanonicalNan):
-        return do_assert_canonical_nan  # type: ignore
-    elif isinstance(command, AssertReturnArithmeticNan):
-        return do_assert_arithmetic_nan  # type: ignore
-    elif isinstance(command, AssertUnlinkable):
-        return do_assert_unlinkable  # type: ignore
-    elif isinstance(command, Register):
-        return do_register  # type: ignore
-    elif isinstance(command, ActionCommand):
-        return run_opcode_action  # type: ignore
-    elif isinstance(command, AssertUninstantiable):
-        return do_assert_uninstantiable  # type: ignore
-    else:
-        raise AssertionError(f"Unsupported module type: {type(command)}")
+# The command datatypes are never subclassed so the handler for a command can
+# be found directly from its exact type.  Each handler only accepts its own
+# command types, which `CommandFn` cannot express, so the table is cast.
+COMMAND_FNS = cast(Dict[type, CommandFn], {
+    ModuleCommand: do_module,
+    AssertReturnCommand: do_assert_return,
+    AssertInvalidCommand: do_assert_invalid,
+    AssertExhaustion: do_assert_exhaustion,
+    AssertMalformed: do_assert_malformed,
+    AssertTrap: do_assert_trap,
+    AssertReturnCanonicalNan: do_assert_canonical_nan,
+    AssertReturnArithmeticNan: do_assert_arithmetic_nan,
+    AssertUnlinkable: do_assert_unlinkable,
+    Register: do_register,
+    ActionCommand: run_opcode_action,
+    AssertUninstantiable: do_assert_uninstantiable,
+})
 
 
 def run_fixture_test(fixture_path: Path,
                      runtime: Runtime,
                      stop_after: int = None) -> None:
-    with fixture_path.open('r') as fixture_file:
-        raw_fixture = json.load(fixture_file)
-
-    fixture = normalize_fixture(fixture_path.parent, raw_fixture)
+    fixture = load_fixture(fixture_path)
 
     module = None
 
     logger.info("Test fixture: %s", fixture.file_path.name)
 
-    all_modules = copy.copy(runtime.modules)
+    all_modules = runtime.snapshot_modules()
 
-    for idx, command in enumerate(fixture.commands):
-        logger.info("command: line=%d  type=%s", command.line, str(type(command)))
+    # The per-command timings are only ever reported through the log so they
+    # are skipped entirely unless it is enabled.
+    log_commands = logger.isEnabledFor(logging.INFO)
 
-        command_fn = get_command_fn(command)
+    export_indexes: ExportIndexes = {}
 
-        start_at = time.perf_counter()
-        result = command_fn(command, module, all_modules, runtime)
-        end_at = time.perf_counter()
+    for idx, command in enumerate(fixture.commands):
+        try:
+            command_fn = COMMAND_FNS[type(command)]
+        except KeyError:
+            raise AssertionError(f"Unsupported module type: {type(command)}")
+
+        if log_commands:
+            logger.info("command: line=%d  type=%s", command.line, type(command).__name__)
+
+            start_at = time.perf_counter()
+            result = command_fn(command, module, all_modules, runtime, export_indexes)
+            end_at = time.perf_counter()
+
+            logger.info(
+                "finished command: line=%d  type=%s  took=%f",
+                command.line,
+                type(command).__name__,
+                end_at - start_at,
+            )
+        else:
+            result = command_fn(command, module, all_modules, runtime, export_indexes)
 
         if result:
             module = result
-        logger.info(
-            "finished command: line=%d  type=%s  took=%f",
-            command.line,
-            str(type(command)),
-            end_at - start_at,
-        )
 
         if stop_after is not None and command.line >= stop_after:
             break